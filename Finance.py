@@ -1,91 +1,200 @@
 import streamlit as st
 import sqlite3
-import pandas as pd
 import os
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
+from contextlib import contextmanager
+import threading
+from calculations import calculate_payoff
 
 # Set page config 
 st.set_page_config(page_title="Personal Finance Dashboard", layout="wide")
 
 # Currency selection
 currency_symbols = {"EUR": "€", "GBP": "£", "USD": "$"}
-currency = st.sidebar.selectbox("Select Currency", list(currency_symbols.keys()), index=0)
-currency_symbol = currency_symbols[currency]
-
-# Database Connection
+st.sidebar.selectbox("Select Currency", list(currency_symbols.keys()), index=0, key="currency")
+currency_symbol = currency_symbols[st.session_state.currency]
+
+# Format an amount in the selected currency
+def format_currency(value):
+    return f"{currency_symbol}{value:,.2f}"
+
+# Write statements, defined once so every call site uses the same SQL
+INSERT_INCOME_SQL = "INSERT INTO incomes (source, amount, category, date) VALUES (?, ?, ?, ?)"
+INSERT_EXPENSE_SQL = "INSERT INTO expenses (amount, category, payment_method, date) VALUES (?, ?, ?, ?)"
+INSERT_DEBT_SQL = "INSERT INTO debts (creditor, amount_owed, interest_rate, min_payment) VALUES (?, ?, ?, ?)"
+INSERT_DEBT_PAYMENT_SQL = "INSERT INTO debt_payments (debt_id, payment_amount, payment_date) VALUES (?, ?, ?)"
+UPDATE_DEBT_AMOUNT_SQL = "UPDATE debts SET amount_owed = ? WHERE creditor = ?"
+ADD_SAVINGS_SQL = "UPDATE savings SET saved_amount = saved_amount + ? WHERE id = 1"
+DEDUCT_SAVINGS_SQL = "UPDATE savings SET saved_amount = saved_amount - ? WHERE id = 1"
+UPDATE_SAVINGS_GOAL_SQL = "UPDATE savings SET goal_amount = ? WHERE id = 1"
+ADD_MONTHLY_SAVINGS_SQL = "UPDATE savings SET monthly_savings = monthly_savings + ?, saved_amount = saved_amount + ? WHERE id = 1"
+
+# Database Connection: one process-wide handle shared by every session and
+# rerun, not one per session; only use it while holding get_db_lock()
+@st.cache_resource
 def get_connection():
-    conn = sqlite3.connect("finance_app.db")
+    conn = sqlite3.connect("finance_app.db", check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
     return conn
 
-def initialize_db():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.executescript('''
-        CREATE TABLE IF NOT EXISTS incomes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            source TEXT,
-            amount REAL,
-            category TEXT,
-            date TEXT
-        );
+# Serialises all use of the shared connection across sessions and threads
+@st.cache_resource
+def get_db_lock():
+    return threading.RLock()
+
+# Date columns, stored as day ordinals (date.toordinal()); format with date.fromordinal() for display
+DATE_COLUMNS = {"incomes": "date", "expenses": "date", "debt_payments": "payment_date"}
+
+# Create (or migrate) the schema and seed the savings row; safe to run repeatedly
+def create_schema():
+    with get_db_lock():
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        # Databases created before dates were day ordinals declare those columns TEXT.
+        # Move such tables aside, let the schema below recreate them, then copy the rows back.
+        move_aside = ""
+        copy_back = ""
+        for table, date_column in DATE_COLUMNS.items():
+            columns = {row["name"]: row["type"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if not columns or columns[date_column].upper() == "INTEGER":
+                continue
+
+            # Indexes follow a renamed table, so drop them to let the schema recreate them
+            for index in conn.execute(f"PRAGMA index_list({table})"):
+                if index["origin"] == "c":
+                    move_aside += f"DROP INDEX {index['name']};\n"
+            move_aside += f"ALTER TABLE {table} RENAME TO {table}_text_dates;\n"
+
+            # ISO date strings convert via julianday (offset so it equals toordinal()); digit-only text is already an ordinal
+            select = ", ".join(
+                f"CASE WHEN {column} GLOB '*[^0-9]*' THEN CAST(julianday({column}) - 1721424.5 AS INTEGER) ELSE CAST({column} AS INTEGER) END"
+                if column == date_column else column
+                for column in columns
+            )
+            copy_back += f"INSERT INTO {table} ({', '.join(columns)}) SELECT {select} FROM {table}_text_dates;\n"
+            copy_back += f"DROP TABLE {table}_text_dates;\n"
+
+        # Migration and schema run as one transaction
+        try:
+            cursor.executescript("BEGIN;\n" + move_aside + '''
+                CREATE TABLE IF NOT EXISTS incomes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source TEXT,
+                    amount REAL,
+                    category TEXT,
+                    date INTEGER
+                );
         
-        CREATE TABLE IF NOT EXISTS expenses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            amount REAL,
-            category TEXT,
-            payment_method TEXT,
-            date TEXT
-        );
+                CREATE TABLE IF NOT EXISTS expenses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    amount REAL,
+                    category TEXT,
+                    payment_method TEXT,
+                    date INTEGER
+                );
         
-        CREATE TABLE IF NOT EXISTS savings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            saved_amount REAL DEFAULT 0,
-            goal_amount REAL DEFAULT 0,
-            monthly_savings REAL DEFAULT 0
-        );
+                CREATE TABLE IF NOT EXISTS savings (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    saved_amount REAL DEFAULT 0,
+                    goal_amount REAL DEFAULT 0,
+                    monthly_savings REAL DEFAULT 0
+                );
         
-        CREATE TABLE IF NOT EXISTS debts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            creditor TEXT,
-            amount_owed REAL,
-            interest_rate REAL,
-            min_payment REAL
-        );
-
-        CREATE TABLE IF NOT EXISTS debt_payments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            debt_id INTEGER,
-            payment_amount REAL,
-            payment_date TEXT,
-            FOREIGN KEY (debt_id) REFERENCES debts (id)
-        );
-    ''')
-    
-    # Ensure the savings table has at least one row
-    cursor.execute("SELECT COUNT(*) AS count FROM savings")
-    count = cursor.fetchone()["count"]
-    if count == 0:
-        cursor.execute("INSERT INTO savings (saved_amount, goal_amount, monthly_savings) VALUES (0, 0, 0)")
+                CREATE TABLE IF NOT EXISTS debts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    creditor TEXT,
+                    amount_owed REAL,
+                    interest_rate REAL,
+                    min_payment REAL
+                );
+
+                CREATE TABLE IF NOT EXISTS debt_payments (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    debt_id INTEGER,
+                    payment_amount REAL,
+                    payment_date INTEGER,
+                    FOREIGN KEY (debt_id) REFERENCES debts (id)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_incomes_date ON incomes (date);
+                CREATE INDEX IF NOT EXISTS idx_incomes_category ON incomes (category);
+                CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (date);
+                CREATE INDEX IF NOT EXISTS idx_expenses_category ON expenses (category);
+                CREATE INDEX IF NOT EXISTS idx_debt_payments_debt_id ON debt_payments (debt_id);
+            ''' + copy_back + "COMMIT;")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
     
-    conn.commit()
-    conn.close()
+        # Ensure the single savings row (id 1) exists
+        cursor.execute("INSERT OR IGNORE INTO savings (id, saved_amount, goal_amount, monthly_savings) VALUES (1, 0, 0, 0)")
 
-def fetch_data(query, params=()):
-    conn = get_connection()
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
-    return df
+# Runs once per process
+@st.cache_resource
+def initialize_db():
+    create_schema()
+    return True
+
+# Run the enclosed statements as a single write transaction, holding the
+# connection lock so no other session's statements can join or interleave
+@contextmanager
+def transaction():
+    with get_db_lock():
+        conn = get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        try:
+            conn.execute("COMMIT")
+        except BaseException:
+            # e.g. SQLITE_BUSY; don't leave the shared connection mid-transaction
+            conn.execute("ROLLBACK")
+            raise
+
+# Batch inserts, each row is a tuple in column order; dates are day ordinals
+def bulk_insert_incomes(rows):
+    with transaction() as conn:
+        conn.executemany(INSERT_INCOME_SQL, rows)
+
+def bulk_insert_expenses(rows):
+    with transaction() as conn:
+        conn.executemany(INSERT_EXPENSE_SQL, rows)
+
+def bulk_insert_debt_payments(rows):
+    with transaction() as conn:
+        conn.executemany(INSERT_DEBT_PAYMENT_SQL, rows)
+
+def fetch_all(query, params=()):
+    with get_db_lock():
+        return get_connection().execute(query, params).fetchall()
+
+def fetch_one(query, params=()):
+    with get_db_lock():
+        return get_connection().execute(query, params).fetchone()
 
 def main():
     st.title("📊 Personal Finance Tracker")
 
     if st.sidebar.button("Reset Database"):
-        if os.path.exists("finance_app.db"):
-            os.remove("finance_app.db")
-        initialize_db()
+        # Swap the shared connection and rebuild the schema under the lock so no other
+        # session sees a closed or empty database. Calls create_schema() rather than
+        # initialize_db(), whose cache lock other sessions take before the database lock.
+        with get_db_lock():
+            get_connection().close()
+            get_connection.clear()
+            if os.path.exists("finance_app.db"):
+                os.remove("finance_app.db")
+            create_schema()
+        st.cache_data.clear()
         st.sidebar.success("Database has been reset successfully!")
         st.rerun()
 
@@ -103,42 +212,32 @@ def main():
     elif choice == "Debt Tracking":
         manage_debts()
 
-def show_overview():
-    st.subheader("💰 Financial Overview")
-
-    # Fetch data
-    income_df = fetch_data("SELECT SUM(amount) AS total_income FROM incomes")
-    expense_df = fetch_data("SELECT SUM(amount) AS total_expense FROM expenses")
-    savings_df = fetch_data("SELECT SUM(saved_amount) AS total_savings FROM savings")
-    debt_df = fetch_data("SELECT SUM(amount_owed) AS total_debt FROM debts")
-    debt_payments_df = fetch_data("SELECT SUM(payment_amount) AS total_debt_payments FROM debt_payments")
-
-    # Calculate totals
-    total_income = income_df.iloc[0]["total_income"] or 0
-    total_expense = expense_df.iloc[0]["total_expense"] or 0
-    total_savings = savings_df.iloc[0]["total_savings"] or 0
-    total_debt = debt_df.iloc[0]["total_debt"] or 0
-    total_debt_payments = debt_payments_df.iloc[0]["total_debt_payments"] or 0
-
-    # Deduct monthly savings from remaining balance
-    monthly_savings = fetch_data("SELECT SUM(monthly_savings) AS total_monthly_savings FROM savings")
-    total_monthly_savings = monthly_savings.iloc[0]["total_monthly_savings"] or 0
-
-    # Calculate remaining balance (after income, expenses, savings, and debt)
-    remaining_balance = total_income - total_expense - total_monthly_savings - total_debt
-
-    # Calculate total remaining balance without debt 
-    remaining_balance_without_debt = total_income - total_expense - total_monthly_savings - total_debt_payments
-
-    # Display metrics
-    col1, col2, col3, col4, col5, col6 = st.columns(6)
-    col1.metric("Total Income", f"{currency_symbol}{total_income:,.2f}")
-    col2.metric("Total Expenses", f"{currency_symbol}{total_expense:,.2f}")
-    col3.metric("Total Savings", f"{currency_symbol}{total_savings:,.2f}")
-    col4.metric("Total Debt", f"{currency_symbol}{total_debt:,.2f}")
-    col5.metric("Remaining Balance", f"{currency_symbol}{remaining_balance:,.2f}")
-    col6.metric("Remaining Balance (Without Debt)", f"{currency_symbol}{remaining_balance_without_debt:,.2f}")
-
+# Overview totals, cached across reruns and cleared whenever the data changes
+@st.cache_data(ttl=60)
+def get_overview_totals():
+    row = fetch_one("""
+        SELECT
+            (SELECT COALESCE(SUM(amount), 0) FROM incomes),
+            (SELECT COALESCE(SUM(amount), 0) FROM expenses),
+            (SELECT COALESCE(SUM(saved_amount), 0) FROM savings),
+            (SELECT COALESCE(SUM(monthly_savings), 0) FROM savings),
+            (SELECT COALESCE(SUM(amount_owed), 0) FROM debts),
+            (SELECT COALESCE(SUM(payment_amount), 0) FROM debt_payments)
+    """)
+
+    total_income, total_expense, total_savings, total_monthly_savings, total_debt, total_debt_payments = row
+    return {
+        "total_income": float(total_income),
+        "total_expense": float(total_expense),
+        "total_savings": float(total_savings),
+        "total_monthly_savings": float(total_monthly_savings),
+        "total_debt": float(total_debt),
+        "total_debt_payments": float(total_debt_payments),
+    }
+
+# Overview pie chart, cached on the totals it is built from
+@st.cache_data
+def build_overview_pie(total_income, total_expense, total_savings, total_debt):
     # Prepare data for the pie chart
     labels = ["Total Income", "Total Expenses", "Total Savings", "Total Debt"]
     values = [total_income, total_expense, total_savings, total_debt]
@@ -176,6 +275,40 @@ def show_overview():
         plot_bgcolor="rgba(0, 0, 0, 0)",
     )
 
+    return fig
+
+def show_overview():
+    st.subheader("💰 Financial Overview")
+
+    # Fetch totals
+    totals = get_overview_totals()
+    total_income = totals["total_income"]
+    total_expense = totals["total_expense"]
+    total_savings = totals["total_savings"]
+    total_debt = totals["total_debt"]
+    total_debt_payments = totals["total_debt_payments"]
+
+    # Deduct monthly savings from remaining balance
+    total_monthly_savings = totals["total_monthly_savings"]
+
+    # Calculate remaining balance (after income, expenses, savings, and debt)
+    remaining_balance = total_income - total_expense - total_monthly_savings - total_debt
+
+    # Calculate total remaining balance without debt 
+    remaining_balance_without_debt = total_income - total_expense - total_monthly_savings - total_debt_payments
+
+    # Display metrics
+    col1, col2, col3, col4, col5, col6 = st.columns(6)
+    col1.metric("Total Income", format_currency(total_income))
+    col2.metric("Total Expenses", format_currency(total_expense))
+    col3.metric("Total Savings", format_currency(total_savings))
+    col4.metric("Total Debt", format_currency(total_debt))
+    col5.metric("Remaining Balance", format_currency(remaining_balance))
+    col6.metric("Remaining Balance (Without Debt)", format_currency(remaining_balance_without_debt))
+
+    # Create the pie chart, rebuilt only when the totals change
+    fig = build_overview_pie(total_income, total_expense, total_savings, total_debt)
+
     # Display the chart
     st.plotly_chart(fig, use_container_width=True)
 
@@ -188,11 +321,8 @@ def manage_income():
         date = st.date_input("Date", datetime.today())
         submitted = st.form_submit_button("Add Income")
         if submitted:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO incomes (source, amount, category, date) VALUES (?, ?, ?, ?)", (source, amount, category, date))
-            conn.commit()
-            conn.close()
+            bulk_insert_incomes([(source, amount, category, date.toordinal())])
+            st.cache_data.clear()
             st.success("Income added successfully!")
             st.rerun()
 
@@ -205,11 +335,8 @@ def manage_expenses():
         date = st.date_input("Date", datetime.today())
         submitted = st.form_submit_button("Add Expense")
         if submitted:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO expenses (amount, category, payment_method, date) VALUES (?, ?, ?, ?)", (amount, category, payment_method, date))
-            conn.commit()
-            conn.close()
+            bulk_insert_expenses([(amount, category, payment_method, date.toordinal())])
+            st.cache_data.clear()
             st.success("Expense added successfully!")
             st.rerun()
 
@@ -217,25 +344,23 @@ def manage_savings():
     st.subheader("💰 Savings & Investments")
 
     # Fetch current savings data
-    savings_df = fetch_data("SELECT * FROM savings LIMIT 1")
+    savings = fetch_one("SELECT saved_amount, goal_amount, monthly_savings FROM savings WHERE id = 1")
 
-    if savings_df.empty:
+    if savings is None:
         st.warning("No savings data found. Please set a savings goal and monthly savings amount.")
         total_savings, goal_amount, monthly_savings = 0.0, 0.0, 0.0
     else:
-        total_savings = float(savings_df.iloc[0]["saved_amount"] or 0)
-        goal_amount = float(savings_df.iloc[0]["goal_amount"] or 0)
-        monthly_savings = float(savings_df.iloc[0]["monthly_savings"] or 0)
+        total_savings, goal_amount, monthly_savings = (float(value or 0) for value in savings)
 
     
     # Display savings metrics
-    st.metric("Total Savings", f"{currency_symbol}{total_savings:,.2f}")
-    st.metric("Savings Goal", f"{currency_symbol}{goal_amount:,.2f}")
-    st.metric("Monthly Savings", f"{currency_symbol}{monthly_savings:,.2f}")
+    st.metric("Total Savings", format_currency(total_savings))
+    st.metric("Savings Goal", format_currency(goal_amount))
+    st.metric("Monthly Savings", format_currency(monthly_savings))
 
     # Remaining amount to goal
     remaining_amount = max(goal_amount - total_savings, 0)
-    st.metric("Remaining Amount to Goal", f"{currency_symbol}{remaining_amount:,.2f}")
+    st.metric("Remaining Amount to Goal", format_currency(remaining_amount))
 
     # Add Savings Form
     with st.form("add_savings_form"):
@@ -243,12 +368,10 @@ def manage_savings():
         savings_amount = st.number_input("Amount to Add to Savings", min_value=0.0, format="%.2f")
         submitted_savings = st.form_submit_button("Add to Savings")
         if submitted_savings:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE savings SET saved_amount = saved_amount + ? WHERE id = (SELECT MIN(id) FROM savings)", (float(savings_amount),))
-            conn.commit()
-            conn.close()
-            st.success(f"Added {currency_symbol}{savings_amount:,.2f} to savings!")
+            with transaction() as conn:
+                conn.execute(ADD_SAVINGS_SQL, (float(savings_amount),))
+            st.cache_data.clear()
+            st.success(f"Added {format_currency(savings_amount)} to savings!")
             st.rerun()
 
     # Update savings goal
@@ -257,12 +380,10 @@ def manage_savings():
         new_goal = st.number_input("Set New Savings Goal", min_value=0.0, format="%.2f", value=goal_amount)
         submitted_goal = st.form_submit_button("Update Goal")
         if submitted_goal:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE savings SET goal_amount = ? WHERE id = (SELECT MIN(id) FROM savings)", (float(new_goal),))
-            conn.commit()
-            conn.close()
-            st.success(f"Savings goal updated to {currency_symbol}{new_goal:,.2f}!")
+            with transaction() as conn:
+                conn.execute(UPDATE_SAVINGS_GOAL_SQL, (float(new_goal),))
+            st.cache_data.clear()
+            st.success(f"Savings goal updated to {format_currency(new_goal)}!")
             st.rerun()
 
     # Update monthly savings and deduct from remaining balance
@@ -271,18 +392,11 @@ def manage_savings():
         new_monthly_savings = st.number_input("Amount to Add to Monthly Savings", min_value=0.0, format="%.2f")
         submitted_monthly = st.form_submit_button("Update Monthly Savings")
         if submitted_monthly:
-            conn = get_connection()
-            cursor = conn.cursor()
             # Add the new monthly savings to both monthly_savings and saved_amount
-            cursor.execute("""
-                UPDATE savings 
-                SET monthly_savings = monthly_savings + ?, 
-                    saved_amount = saved_amount + ? 
-                WHERE id = (SELECT MIN(id) FROM savings)
-            """, (float(new_monthly_savings), float(new_monthly_savings)))
-            conn.commit()
-            conn.close()
-            st.success(f"Added {currency_symbol}{new_monthly_savings:,.2f} to monthly savings and total savings!")
+            with transaction() as conn:
+                conn.execute(ADD_MONTHLY_SAVINGS_SQL, (float(new_monthly_savings), float(new_monthly_savings)))
+            st.cache_data.clear()
+            st.success(f"Added {format_currency(new_monthly_savings)} to monthly savings and total savings!")
             st.rerun()
     
     # Calculate time to reach the goal
@@ -291,7 +405,7 @@ def manage_savings():
         
         # Calculate months required to reach the goal
         months_to_goal = remaining_amount / monthly_savings
-        st.write(f"At your current monthly savings rate of **{currency_symbol}{monthly_savings:,.2f}**, it will take approximately **{months_to_goal:.1f} months** to reach your goal.")
+        st.write(f"At your current monthly savings rate of **{format_currency(monthly_savings)}**, it will take approximately **{months_to_goal:.1f} months** to reach your goal.")
     elif goal_amount > 0 and monthly_savings <= 0:
         st.warning("Please set a monthly savings amount to calculate the time to reach your goal.")
     else:
@@ -302,7 +416,7 @@ def manage_debts():
     st.subheader("📉 Debt Tracking")
 
     # Fetch all debts
-    debts_df = fetch_data("SELECT * FROM debts")
+    debts = fetch_all("SELECT * FROM debts")
 
     # Add new debt form
     with st.form("debt_form"):
@@ -313,59 +427,51 @@ def manage_debts():
         min_payment = st.number_input("Minimum Payment", min_value=0.0, format="%.2f")
         submitted = st.form_submit_button("Add Debt")
         if submitted:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO debts (creditor, amount_owed, interest_rate, min_payment) VALUES (?, ?, ?, ?)", (creditor, amount, interest_rate, min_payment))
-            conn.commit()
-            conn.close()
+            with transaction() as conn:
+                conn.execute(INSERT_DEBT_SQL, (creditor, amount, interest_rate, min_payment))
+            st.cache_data.clear()
             st.success("Debt added successfully!")
             st.rerun()
 
     # Display debts in a user-friendly format
-    if not debts_df.empty:
+    if debts:
         st.subheader("📝 Current Debts")
-        for _, debt in debts_df.iterrows():
+        for debt in debts:
             with st.expander(f"**{debt['creditor']}**"):
-                st.write(f"**Amount Owed:** {currency_symbol}{debt['amount_owed']:,.2f}")
+                st.write(f"**Amount Owed:** {format_currency(debt['amount_owed'])}")
                 st.write(f"**Interest Rate:** {debt['interest_rate']:.2f}%")
-                st.write(f"**Minimum Payment:** {currency_symbol}{debt['min_payment']:,.2f}")
+                st.write(f"**Minimum Payment:** {format_currency(debt['min_payment'])}")
 
     # Debt Repayment Calculator
-    if not debts_df.empty:
+    if debts:
         st.subheader("🧮 Debt Repayment Calculator")
 
         # Select a debt to calculate repayment
-        debt_options = debts_df["creditor"].tolist()
+        debt_options = [debt["creditor"] for debt in debts]
         selected_debt = st.selectbox("Select a Debt to Calculate Repayment", debt_options)
 
         # Get details of the selected debt
-        selected_debt_details = debts_df[debts_df["creditor"] == selected_debt].iloc[0]
+        selected_debt_details = next(debt for debt in debts if debt["creditor"] == selected_debt)
         amount_owed = selected_debt_details["amount_owed"]
         interest_rate = selected_debt_details["interest_rate"]
         min_payment = selected_debt_details["min_payment"]
+        monthly_interest_rate = (interest_rate / 100) / 12
 
         # Display selected debt details
-        st.write(f"**Amount Owed:** {currency_symbol}{amount_owed:,.2f}")
+        st.write(f"**Amount Owed:** {format_currency(amount_owed)}")
         st.write(f"**Interest Rate:** {interest_rate:.2f}%")
-        st.write(f"**Minimum Payment:** {currency_symbol}{min_payment:,.2f}")
+        st.write(f"**Minimum Payment:** {format_currency(min_payment)}")
 
         # Calculate time to pay off debt with minimum payment
         st.subheader("⏳ Time to Pay Off Debt (Minimum Payment)")
         if min_payment > 0:
-            monthly_interest_rate = (interest_rate / 100) / 12
-            remaining_balance = amount_owed
-            months = 0
-            total_interest = 0
-
-            while remaining_balance > 0:
-                interest = remaining_balance * monthly_interest_rate
-                principal = min_payment - interest
-                remaining_balance -= principal
-                total_interest += interest
-                months += 1
-
-            st.write(f"It will take **{months} months** (approximately **{months / 12:.1f} years**) to pay off this debt with the minimum payment.")
-            st.write(f"**Total Interest Paid:** {currency_symbol}{total_interest:,.2f}")
+            months, total_interest = calculate_payoff(amount_owed, monthly_interest_rate, min_payment)
+
+            if months is None:
+                st.warning("The minimum payment does not cover the monthly interest, so this debt will never be paid off. Increase the minimum payment.")
+            else:
+                st.write(f"It will take **{months} months** (approximately **{months / 12:.1f} years**) to pay off this debt with the minimum payment.")
+                st.write(f"**Total Interest Paid:** {format_currency(total_interest)}")
         else:
             st.warning("Minimum payment must be greater than 0 to calculate repayment time.")
 
@@ -374,11 +480,7 @@ def manage_debts():
         additional_payment = st.number_input("Additional Payment Amount", min_value=0.0, format="%.2f")
         if st.button("Apply Additional Payment"):
          if additional_payment > 0:
-          conn = get_connection()
-          cursor = conn.cursor()
-        
           # Calculate interest for the current month
-          monthly_interest_rate = (interest_rate / 100) / 12
           interest = amount_owed * monthly_interest_rate
 
           # Deduct interest from the additional payment
@@ -388,26 +490,23 @@ def manage_debts():
           else:
               # Update the amount owed
               new_amount_owed = amount_owed - principal_payment
-              cursor.execute("UPDATE debts SET amount_owed = ? WHERE creditor = ?", (new_amount_owed, selected_debt))
-            
-              # Record the payment in the debt_payments table
-              cursor.execute("INSERT INTO debt_payments (debt_id, payment_amount, payment_date) VALUES (?, ?, ?)", 
-                          (selected_debt_details["id"], additional_payment, datetime.today().strftime("%Y-%m-%d")))
-            
-              # Deduct the additional payment from the remaining balance without debt
-              cursor.execute("""
-                  UPDATE savings 
-                  SET saved_amount = saved_amount - ? 
-                  WHERE id = (SELECT MIN(id) FROM savings)
-              """, (float(additional_payment),))
-            
-              conn.commit()
-              conn.close()
-
-              st.success(f"Additional payment of {currency_symbol}{additional_payment:,.2f} applied to {selected_debt}!")
-              st.write(f"**Interest Paid:** {currency_symbol}{interest:,.2f}")
-              st.write(f"**Principal Paid:** {currency_symbol}{principal_payment:,.2f}")
-              st.write(f"**New Amount Owed:** {currency_symbol}{new_amount_owed:,.2f}")
+
+              # Apply all three writes atomically in one transaction
+              with transaction() as conn:
+                  conn.execute(UPDATE_DEBT_AMOUNT_SQL, (new_amount_owed, selected_debt))
+
+                  # Record the payment in the debt_payments table
+                  conn.execute(INSERT_DEBT_PAYMENT_SQL, (selected_debt_details["id"], additional_payment, datetime.today().toordinal()))
+
+                  # Deduct the additional payment from the remaining balance without debt
+                  conn.execute(DEDUCT_SAVINGS_SQL, (float(additional_payment),))
+
+              st.cache_data.clear()
+
+              st.success(f"Additional payment of {format_currency(additional_payment)} applied to {selected_debt}!")
+              st.write(f"**Interest Paid:** {format_currency(interest)}")
+              st.write(f"**Principal Paid:** {format_currency(principal_payment)}")
+              st.write(f"**New Amount Owed:** {format_currency(new_amount_owed)}")
               st.rerun()
          else:
             st.warning("Additional payment must be greater than 0.")
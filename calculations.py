@@ -0,0 +1,20 @@
+import math
+
+# Debt calculations, kept free of Streamlit so they can be tested directly
+
+# Months and total interest to pay off a balance with a fixed monthly payment,
+# using the closed-form amortization formula; (None, None) if it never amortizes
+def calculate_payoff(balance, monthly_interest_rate, payment):
+    if balance <= 0:
+        return 0, 0.0
+    if monthly_interest_rate == 0:
+        return math.ceil(balance / payment), 0.0
+    if payment <= balance * monthly_interest_rate:
+        return None, None
+
+    months = math.ceil(-math.log(1 - monthly_interest_rate * balance / payment) / math.log(1 + monthly_interest_rate))
+    # Balance after the final payment (zero or a small overpayment)
+    growth = (1 + monthly_interest_rate) ** months
+    final_balance = balance * growth - payment * (growth - 1) / monthly_interest_rate
+    total_interest = payment * months - balance + final_balance
+    return months, total_interest
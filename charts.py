@@ -0,0 +1,35 @@
+import plotly.graph_objects as go
+
+# Chart helpers for the Overview page, kept free of Streamlit so they can be tested directly
+
+# Reduce a series to at most max_points samples, keeping the first and last samples
+# and the min and max of each bucket in between so the x-range, peaks and dips survive
+def downsample_series(x, y, max_points=2000):
+    x, y = list(x), list(y)
+    max_points = max(max_points, 4)
+    if len(x) <= max_points:
+        return x, y
+
+    buckets = (max_points - 2) // 2
+    size = (len(x) - 2) / buckets
+    keep = [0]
+    for b in range(buckets):
+        bucket = range(1 + int(b * size), 1 + int((b + 1) * size))
+        low = min(bucket, key=y.__getitem__)
+        high = max(bucket, key=y.__getitem__)
+        keep.extend(sorted({low, high}))
+    keep.append(len(x) - 1)
+
+    return [x[i] for i in keep], [y[i] for i in keep]
+
+# Line chart for time series, downsampled so large histories stay responsive
+def build_time_series_figure(x, y, name, max_points=2000):
+    x, y = downsample_series(x, y, max_points)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=x, y=y, name=name, mode="lines"))
+    fig.update_layout(
+        paper_bgcolor="rgba(0, 0, 0, 0)",
+        plot_bgcolor="rgba(0, 0, 0, 0)",
+    )
+    return fig
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from calculations import calculate_payoff
+
+
+# The month-by-month simulation calculate_payoff replaced
+def simulate_payoff(balance, monthly_interest_rate, payment):
+    months = 0
+    total_interest = 0
+    while balance > 0:
+        interest = balance * monthly_interest_rate
+        balance -= payment - interest
+        total_interest += interest
+        months += 1
+    return months, total_interest
+
+
+def test_zero_balance_is_already_paid_off():
+    assert calculate_payoff(0, 0.01, 50) == (0, 0.0)
+    assert calculate_payoff(-25.0, 0.01, 50) == (0, 0.0)
+
+
+def test_zero_rate_is_a_plain_division():
+    assert calculate_payoff(1000, 0, 300) == (4, 0.0)
+    assert calculate_payoff(900, 0, 300) == (3, 0.0)
+    assert calculate_payoff(1000, 0, 300) == simulate_payoff(1000, 0, 300)
+
+
+@pytest.mark.parametrize("payment", [5.0, 10.0])
+def test_payment_not_covering_interest_never_pays_off(payment):
+    # 1% of 1000 is 10 interest a month
+    assert calculate_payoff(1000, 0.01, payment) == (None, None)
+
+
+def test_total_interest_accounts_for_final_overpayment():
+    months, total_interest = calculate_payoff(100, 0.01, 30)
+    expected_months, expected_interest = simulate_payoff(100, 0.01, 30)
+    assert months == expected_months == 4
+    assert total_interest == pytest.approx(expected_interest)
+    # Charging the full payment in the final month would overstate the interest
+    assert total_interest < 30 * months - 100
+
+
+def test_matches_month_by_month_simulation():
+    rng = random.Random(0)
+    checked = 0
+    while checked < 2000:
+        balance = round(rng.uniform(1, 50_000), 2)
+        annual_rate = rng.choice([0.0, round(rng.uniform(0, 30), 2)])
+        monthly_interest_rate = (annual_rate / 100) / 12
+        payment = round(rng.uniform(1, 3_000), 2)
+        # Near the break-even payment the simulation runs for thousands of months
+        if payment <= balance * monthly_interest_rate * 1.05:
+            continue
+
+        months, total_interest = calculate_payoff(balance, monthly_interest_rate, payment)
+        expected_months, expected_interest = simulate_payoff(balance, monthly_interest_rate, payment)
+        assert months == expected_months, (balance, annual_rate, payment)
+        assert total_interest == pytest.approx(expected_interest, rel=1e-6, abs=1e-6), (balance, annual_rate, payment)
+        checked += 1
@@ -0,0 +1,41 @@
+from charts import build_time_series_figure, downsample_series
+
+
+def test_short_series_is_unchanged():
+    x, y = downsample_series(range(5), [3, 1, 4, 1, 5])
+    assert x == [0, 1, 2, 3, 4]
+    assert y == [3, 1, 4, 1, 5]
+
+
+def test_downsampled_length_is_bounded():
+    x, y = downsample_series(range(100_003), [i % 97 for i in range(100_003)], max_points=500)
+    assert len(x) == len(y) <= 500
+    assert x == sorted(x)
+
+
+def test_endpoints_are_kept():
+    x, y = downsample_series(range(10_000), [5] * 10_000, max_points=100)
+    assert x[0] == 0
+    assert x[-1] == 9_999
+
+
+def test_peaks_and_dips_are_kept():
+    values = [0.0] * 10_000
+    values[1234] = 100.0
+    values[8765] = -100.0
+    x, y = downsample_series(range(10_000), values, max_points=50)
+    assert 1234 in x and 100.0 in y
+    assert 8765 in x and -100.0 in y
+
+
+def test_tiny_max_points_is_clamped():
+    x, y = downsample_series(range(1_000), range(1_000), max_points=1)
+    assert 2 <= len(x) <= 4
+    assert x[0] == 0 and x[-1] == 999
+
+
+def test_figure_uses_downsampled_trace():
+    fig = build_time_series_figure(range(10_000), range(10_000), "Balance", max_points=100)
+    assert len(fig.data) == 1
+    assert fig.data[0].name == "Balance"
+    assert len(fig.data[0].x) <= 100